@@ -7,21 +7,46 @@ import datetime
 from typing import TextIO, Union, List
 
 
+def _keyword_template(keyword: str, args_count: int) -> str:
+
+    """
+    Builds a str.format template for a single-record keyword with a fixed number of arguments.
+
+    :param keyword: keyword name
+    :param args_count: number of keyword arguments
+    :return: template string with a positional placeholder for every argument
+    """
+
+    return f'{keyword}\n' + '{} ' * args_count + '/\n/\n\n'
+
+
+_WELSPECS_TEMPLATE = _keyword_template('WELSPECS', 13)
+_WCONHIST_TEMPLATE = _keyword_template('WCONHIST', 12)
+_WCONINJH_TEMPLATE = _keyword_template('WCONINJH', 12)
+_WEFAC_TEMPLATE = _keyword_template('WEFAC', 3)
+_COMPDATMD_TEMPLATE = _keyword_template('COMPDATMD', 14)
+
+# tNav month codes indexed by month number
+_MONTH_CODES = (None, 'JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JLY', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC')
+
+
 def _write_to_dest(
         string: str,
-        dest: Union[str, TextIO]
+        dest: Union[str, TextIO, List[str]]
         ) -> None:
 
     """
     Writes a string either to stdout or to the specified file.
 
     :param string: string to be written.
-    :param dest: writing destination. Accepts either 'stdout' for writing to stdout
-                 or a TextIO object for writing to files.
+    :param dest: writing destination. Accepts either 'stdout' for writing to stdout,
+                 a TextIO object for writing to files or a list used as a write buffer.
     :return: None
     """
 
-    if dest == 'stdout':
+    if isinstance(dest, list):
+        dest.append(string)
+    elif dest == 'stdout':
         print(string)
     else:
         dest.writelines(string)
@@ -41,7 +66,7 @@ def specs_out(
         pres_table_num: int = None,
         dens_calc_type: str = None,
         fip_region: int = None,
-        dest: Union[str, TextIO] = 'stdout'
+        dest: Union[str, TextIO, List[str]] = 'stdout'
         ) -> None:
     """
     Writes WELSPECS tNav keyword to the specified destination.
@@ -60,21 +85,15 @@ def specs_out(
     :param pres_table_num: arg 11 of tNav WELSPECS keyword
     :param dens_calc_type: arg 12 of tNav WELSPECS keyword
     :param fip_region: arg 13 of tNav WELSPECS keyword
-    :param dest: writing destination. Accepts either 'stdout' for writing to stdout
-                 or a TextIO object for writing to files.
+    :param dest: writing destination. Accepts either 'stdout' for writing to stdout,
+                 a TextIO object for writing to files or a list used as a write buffer.
     :return: None
     """
 
-    input_args = locals()
-    input_args.pop('dest')
-
-    keyword = 'WELSPECS\n'
+    input_vals = (well_name, pad, coord_x, coord_y, ref_depth, phase, drainage_radius, special_inflow, eco_behavior,
+                  crossflow_flag, pres_table_num, dens_calc_type, fip_region)
 
-    for keyword_arg in input_args.items():
-        arg, val = keyword_arg
-        keyword += (str(val) if val is not None else '*') + ' '
-    keyword += '/\n'
-    keyword += '/\n\n'
+    keyword = _WELSPECS_TEMPLATE.format(*('*' if val is None else val for val in input_vals))
 
     _write_to_dest(keyword, dest)
 
@@ -82,7 +101,7 @@ def specs_out(
 def traj_out(
         well_name: str,
         coordinates: List[tuple],
-        dest: Union[str, TextIO] = 'stdout'
+        dest: Union[str, TextIO, List[str]] = 'stdout'
         ) -> None:
 
     """
@@ -96,25 +115,20 @@ def traj_out(
                             [1] - Y coordinate;
                             [2] - MD;
                             [3] - Z coordinate;
-    :param dest: writing destination. Accepts either 'stdout' for writing to stdout
-                 or a TextIO object for writing to files.
+    :param dest: writing destination. Accepts either 'stdout' for writing to stdout,
+                 a TextIO object for writing to files or a list used as a write buffer.
     :return: None
     """
 
-    keyword = f'WELLTRACK {well_name}\n'
-
-    for coord_point in coordinates:
-        coord_x, coord_y, md, coord_z = coord_point
-        keyword += f'{coord_x} {coord_y} {coord_z} {md} \n'
-
-    keyword += '/\n\n'
+    lines = ''.join(f'{coord_x} {coord_y} {coord_z} {md} \n' for coord_x, coord_y, md, coord_z in coordinates)
+    keyword = f'WELLTRACK {well_name}\n{lines}/\n\n'
 
     _write_to_dest(keyword, dest)
 
 
 def dates_out(
         timestamp: Union[datetime.datetime, datetime.date],
-        dest: Union[str, TextIO] = 'stdout'
+        dest: Union[str, TextIO, List[str]] = 'stdout'
 ) -> None:
     """
     Writes DATES tNav keyword to the specified output.
@@ -123,41 +137,17 @@ def dates_out(
     :param timestamp: a datetime.datetime or datetime.date object.
                       Passing a date object will suppress writing of hours, minutes and seconds.
                       Otherwise, if passed a datetime object, the hours, minutes and seconds will always be written.
-    :param dest: writing destination. Accepts either 'stdout' for writing to stdout
-                 or a TextIO object for writing to files.
+    :param dest: writing destination. Accepts either 'stdout' for writing to stdout,
+                 a TextIO object for writing to files or a list used as a write buffer.
     :return: None
     """
 
-    month_codes = {
-        1: 'JAN',
-        2: 'FEB',
-        3: 'MAR',
-        4: 'APR',
-        5: 'MAY',
-        6: 'JUN',
-        7: 'JLY',
-        8: 'AUG',
-        9: 'SEP',
-        10: 'OCT',
-        11: 'NOV',
-        12: 'DEC'
-    }
-
-    day = timestamp.day
-    month = month_codes[timestamp.month]
-    year = timestamp.year
-    try:
-        hour = timestamp.hour
-        minute = timestamp.minute
-        second = timestamp.second
-    except AttributeError:
-        hour, minute, second = None, None, None
-
-    hour_tail = '' if hour is None else f'{hour:02}:{minute:02}:{second:02} '
-
-    keyword = 'DATES\n'
-    keyword += f'{day:02} {month} {year} {hour_tail}/\n'
-    keyword += '/\n\n'
+    if isinstance(timestamp, datetime.datetime):
+        hour_tail = f'{timestamp.hour:02}:{timestamp.minute:02}:{timestamp.second:02} '
+    else:
+        hour_tail = ''
+
+    keyword = f'DATES\n{timestamp.day:02} {_MONTH_CODES[timestamp.month]} {timestamp.year} {hour_tail}/\n/\n\n'
 
     _write_to_dest(keyword, dest)
 
@@ -175,7 +165,7 @@ def wconprodh_out(
         bhp_h: float = None,
         wet_gas_rate_h: float = None,
         ngl_rate_h: float = None,
-        dest: Union[str, TextIO] = 'stdout'
+        dest: Union[str, TextIO, List[str]] = 'stdout'
 ) -> None:
     """
     Writes WCONHIST tNav keyword to the specified output.
@@ -193,22 +183,15 @@ def wconprodh_out(
     :param bhp_h: arg 10 of tNav WCONHIST keyword
     :param wet_gas_rate_h: arg 11 of tNav WCONHIST keyword
     :param ngl_rate_h: arg 12 of tNav WCONHIST keyword
-    :param dest: writing destination. Accepts either 'stdout' for writing to stdout
-                 or a TextIO object for writing to files.
+    :param dest: writing destination. Accepts either 'stdout' for writing to stdout,
+                 a TextIO object for writing to files or a list used as a write buffer.
     :return: None
     """
 
-    initial_args = locals()
-    initial_args.pop('dest')
+    input_vals = (well_name, well_status, well_control, oil_rate_h, water_rate_h, gas_rate_h, vfp_num, alq, thp_h,
+                  bhp_h, wet_gas_rate_h, ngl_rate_h)
 
-    keyword = 'WCONHIST\n'
-    for keyword_arg in initial_args.items():
-        arg, val = keyword_arg
-
-        keyword += '* ' if val is None else f'{str(val)} '
-
-    keyword += '/\n'
-    keyword += '/\n\n'
+    keyword = _WCONHIST_TEMPLATE.format(*('*' if val is None else val for val in input_vals))
 
     _write_to_dest(keyword, dest)
 
@@ -226,7 +209,7 @@ def wconinjh_out(
         surf_water_part: float = None,
         surf_gas_part: float = None,
         well_control: str = 'RATE',
-        dest: Union[str, TextIO] = 'stdout'
+        dest: Union[str, TextIO, List[str]] = 'stdout'
 ) -> None:
     """
     Writes WCONINJH tNav keyword to the specified output.
@@ -244,22 +227,15 @@ def wconinjh_out(
     :param surf_water_part: arg 10 of tNav WCONINJH keyword
     :param surf_gas_part: arg 11 of tNav WCONINJH keyword
     :param well_control: arg 12 of tNav WCONINJH keyword
-    :param dest: writing destination. Accepts either 'stdout' for writing to stdout
-                 or a TextIO object for writing to files.
+    :param dest: writing destination. Accepts either 'stdout' for writing to stdout,
+                 a TextIO object for writing to files or a list used as a write buffer.
     :return:
     """
 
-    initial_args = locals()
-    initial_args.pop('dest')
-
-    keyword = 'WCONINJH\n'
-    for keyword_arg in initial_args.items():
-        arg, val = keyword_arg
+    input_vals = (well_name, injected_fluid, well_status, inj_rate_h, bhp_h, thp_h, vfp_num, second_phase_concentration,
+                  surf_oil_part, surf_water_part, surf_gas_part, well_control)
 
-        keyword += '* ' if val is None else f'{str(val)} '
-
-    keyword += '/\n'
-    keyword += '/\n\n'
+    keyword = _WCONINJH_TEMPLATE.format(*('*' if val is None else val for val in input_vals))
 
     _write_to_dest(keyword, dest)
 
@@ -268,7 +244,7 @@ def wefac_out(
         well_name: str,
         efficiency_factor: float = 1,
         apply_to_network: str = None,
-        dest: Union[str, TextIO] = 'stdout'
+        dest: Union[str, TextIO, List[str]] = 'stdout'
 ) -> None:
     """
     Writes WEFAC tNav keyword to the specified output.
@@ -277,22 +253,14 @@ def wefac_out(
     :param well_name: arg 1 of tNav WEFAC keyword
     :param efficiency_factor: arg 2 of tNav WEFAC keyword
     :param apply_to_network: arg 3 of tNav WEFAC keyword
-    :param dest: writing destination. Accepts either 'stdout' for writing to stdout
-                 or a TextIO object for writing to files.
+    :param dest: writing destination. Accepts either 'stdout' for writing to stdout,
+                 a TextIO object for writing to files or a list used as a write buffer.
     :return: None
     """
 
-    initial_args = locals()
-    initial_args.pop('dest')
-
-    keyword = 'WEFAC\n'
-    for keyword_arg in initial_args.items():
-        arg, val = keyword_arg
-
-        keyword += '* ' if val is None else f'{str(val)} '
+    input_vals = (well_name, efficiency_factor, apply_to_network)
 
-    keyword += '/\n'
-    keyword += '/\n\n'
+    keyword = _WEFAC_TEMPLATE.format(*('*' if val is None else val for val in input_vals))
 
     _write_to_dest(keyword, dest)
 
@@ -312,7 +280,7 @@ def perf_out(
         d_factor: float = None,
         connection_factor_mult: float = 1,
         completion_type: str = None,
-        dest: Union[str, TextIO] = 'stdout'
+        dest: Union[str, TextIO, List[str]] = 'stdout'
 ) -> None:
     """
     Writes COMPDATMD tNav keyword to the specified output.
@@ -332,22 +300,15 @@ def perf_out(
     :param d_factor: arg 12 of tNav COMPDATMD keyword
     :param connection_factor_mult: arg 13 of tNav COMPDATMD keyword
     :param completion_type: arg 14 of tNav COMPDATMD keyword
-    :param dest: writing destination. Accepts either 'stdout' for writing to stdout
-                 or a TextIO object for writing to files.
+    :param dest: writing destination. Accepts either 'stdout' for writing to stdout,
+                 a TextIO object for writing to files or a list used as a write buffer.
     :return: None
     """
 
-    initial_args = locals()
-    initial_args.pop('dest')
-
-    keyword = 'COMPDATMD\n'
-    for keyword_arg in initial_args.items():
-        arg, val = keyword_arg
-
-        keyword += '* ' if val is None else f'{str(val)} '
+    input_vals = (well_name, branch_num, lower_depth, upper_depth, depth_type, status, sat_num, trans_factor, well_diam,
+                  effective_kh, skin, d_factor, connection_factor_mult, completion_type)
 
-    keyword += '/\n'
-    keyword += '/\n\n'
+    keyword = _COMPDATMD_TEMPLATE.format(*('*' if val is None else val for val in input_vals))
 
     _write_to_dest(keyword, dest)
 
@@ -355,7 +316,7 @@ def perf_out(
 def generic_kw_out(
         keyword: str,
         args: str,
-        dest: Union[str, TextIO] = 'stdout'
+        dest: Union[str, TextIO, List[str]] = 'stdout'
         ) -> None:
 
     """
@@ -364,8 +325,8 @@ def generic_kw_out(
 
     :param keyword: keyword to be written
     :param args: keyword arguments as a string (e.g. well_name OPEN 10 * /)
-    :param dest: writing destination. Accepts either 'stdout' for writing to stdout
-                 or a TextIO object for writing to files.
+    :param dest: writing destination. Accepts either 'stdout' for writing to stdout,
+                 a TextIO object for writing to files or a list used as a write buffer.
     :return: None
     """
 
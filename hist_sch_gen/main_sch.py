@@ -3,36 +3,40 @@ Main script that generates historic schedule (timesteps, controls, wefacs, etc).
 Refer to the supplied document for input data descripitions.
 """
 
-import calendar
 import sys
 
+import numpy as np
 import pandas as pd
 from tqdm import tqdm
 
 from kwriter import *
 
+PERF_COLS = ['Название в модели', 'Глубина начала интервала перфорации(md), м',
+             'Глубина конца интервала перфорации(md), м', 'perf_flag']
+PRODUCTION_COLS = ['*WELL', 'inj_flag', 'prod_flag', 'WINJ', 'BHP_STR', 'THP_STR', 'OIL', 'WATER', 'GAS',
+                   'efficiency']
+MAN_OPS_COLS = ['Ключевое слово', 'Аргумент']
+
 
 def preprocess_prod(df: pd.DataFrame) -> pd.DataFrame:
     """
     Preprocesses the production history dataframe.
 
-    :param df: dataframe containing production history
+    :param df: dataframe containing production history, DATE column already parsed to datetime
     :return: processed dataframe
     """
 
-    df['DATE'] = pd.to_datetime(df['DATE'], format='%d.%m.%Y')
+    df['month_length'] = df['DATE'].dt.days_in_month
 
-    df['month_length'] = df.apply(lambda row:
-                                  calendar.monthrange(
-                                      row['DATE'].year,
-                                      row['DATE'].month
-                                  )[1],
-                                  axis=1)
+    rate_cols = ['OIL', 'WATER', 'GAS', 'WINJ']
+    df[rate_cols] = df[rate_cols].div(df['DAYS'], axis=0)
 
-    df['OIL'] = df['OIL'] / df['DAYS']
-    df['WATER'] = df['WATER'] / df['DAYS']
-    df['GAS'] = df['GAS'] / df['DAYS']
-    df['WINJ'] = df['WINJ'] / df['DAYS']
+    # well status and efficiency factor are decided for the whole table at once, outside the timestep loop
+    df['inj_flag'] = df['WINJ'] > 0
+    df['prod_flag'] = df['OIL'] > 0
+    df['efficiency'] = df['DAYS'] / df['month_length']
+    df['BHP_STR'] = df['BHP'].astype(str).where(df['BHP'] > 0, '*')
+    df['THP_STR'] = df['THP'].astype(str).where(df['THP'] > 0, '*')
 
     return df
 
@@ -47,18 +51,10 @@ def preprocess_perf(df: pd.DataFrame) -> pd.DataFrame:
 
     df['Дата'] = pd.to_datetime(df['Дата'], format='%d.%m.%Y')
     # rounding dates to simulation timesteps since data in csv doesn't align with timesteps
-    df['Дата'] = df['Дата'].apply(lambda value:
-                                  datetime.datetime(
-                                      year=value.year,
-                                      month=value.month,
-                                      day=1
-                                  )
-                                  )
-
-    df['perf_flag'] = df['Тип перфорации'].apply(lambda row:
-                                                 True if pd.isna(row) else
-                                                 True if 'ПЕРФ' in row else False
-                                                 )
+    df['Дата'] = df['Дата'].dt.to_period('M').dt.to_timestamp()
+
+    perf_type = df['Тип перфорации']
+    df['perf_flag'] = perf_type.isna() | perf_type.astype('string').str.contains('ПЕРФ', regex=False, na=False)
 
     return df
 
@@ -70,6 +66,105 @@ def preprocess_manops(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+def timestep_slice(df: pd.DataFrame, dates: np.ndarray, timestep: pd.Timestamp) -> pd.DataFrame:
+    """
+    Returns the rows of a date-sorted dataframe falling on the specified timestep.
+
+    :param df: dataframe sorted by date
+    :param dates: the dataframe's date column as a numpy array
+    :param timestep: timestep to be selected
+    :return: dataframe slice for the timestep
+    """
+
+    timestep = timestep.to_datetime64()
+
+    return df.iloc[np.searchsorted(dates, timestep, 'left'):np.searchsorted(dates, timestep, 'right')]
+
+
+def perforations_out(perf_slice: pd.DataFrame, dest: list) -> None:
+    """
+    Writes COMPDATMD keywords for every perforation record of the slice.
+
+    :param perf_slice: preprocessed perforation data slice
+    :param dest: writing buffer
+    :return: None
+    """
+
+    for well, lower_depth, upper_depth, perf_flag in perf_slice[PERF_COLS].itertuples(index=False, name=None):
+        perf_out(
+            well_name=well,
+            lower_depth=lower_depth,
+            upper_depth=upper_depth,
+            depth_type='MD',
+            status='OPEN' if perf_flag else 'SHUT',
+            well_diam=.16,
+            dest=dest
+        )
+
+
+def timestep_out(
+        production_slice: pd.DataFrame,
+        perf_slice: pd.DataFrame,
+        man_ops_slice: pd.DataFrame,
+        dest: list
+        ) -> None:
+    """
+    Writes perforations, well controls and manual operations of a single timestep.
+
+    :param production_slice: preprocessed production history slice of the timestep
+    :param perf_slice: preprocessed perforation data slice of the timestep
+    :param man_ops_slice: manual operations slice of the timestep
+    :param dest: writing buffer
+    :return: None
+    """
+
+    perforations_out(perf_slice, dest)
+
+    # main controls
+    for well, inj_flag, prod_flag, winj, bhp_str, thp_str, oil, water, gas, efficiency in \
+            production_slice[PRODUCTION_COLS].itertuples(index=False, name=None):
+
+        if inj_flag:
+            wconinjh_out(
+                well_name=well,
+                injected_fluid='WATER',
+                well_status='OPEN',
+                inj_rate_h=winj,
+                bhp_h=bhp_str,
+                thp_h=thp_str,
+                well_control='RATE',
+                dest=dest
+            )
+
+        if prod_flag:
+            wconprodh_out(
+                well_name=well,
+                well_status='OPEN',
+                well_control='LRAT',
+                oil_rate_h=oil,
+                water_rate_h=water,
+                gas_rate_h=gas,
+                thp_h=thp_str,
+                bhp_h=bhp_str,
+                dest=dest
+            )
+
+        wefac_out(
+            well_name=well,
+            efficiency_factor=efficiency,
+            dest=dest
+        )
+
+    # manual operations
+    for keyword, args in man_ops_slice[MAN_OPS_COLS].itertuples(index=False, name=None):
+
+        generic_kw_out(
+            keyword=keyword,
+            args=args,
+            dest=dest
+        )
+
+
 if __name__ == '__main__':
 
     input_directory = sys.argv[1]
@@ -78,24 +173,33 @@ if __name__ == '__main__':
     end_date = datetime.datetime.strptime(sys.argv[4], '%Y-%m-%d')
     field = sys.argv[5]
 
-    production = pd.read_csv(f'{input_directory}/production_kmb.csv', encoding='cp1251')
-    production = pd.concat([production] +
-                           [pd.read_csv(f'{input_directory}/production_tk.csv', encoding='cp1251')]
-                           )
-    production = production.merge(pd.read_csv(f'{input_directory}/well_table.csv', encoding='cp1251', sep=','),
-                                  'left', left_on='*WELL', right_on='Название в модели')
+    well_table = pd.read_csv(f'{input_directory}/well_table.csv', encoding='cp1251', sep=',')
+    well_table = well_table[well_table['Привязка к залежи'] == field]
+
+    production_read_args = dict(
+        encoding='cp1251',
+        # BHP and THP are left to inference since they are written to the schedule as read
+        dtype={'*WELL': 'string', 'OIL': 'float64', 'WATER': 'float64', 'GAS': 'float64', 'WINJ': 'float64',
+               'DAYS': 'float64'},
+        parse_dates=['DATE'],
+        date_format='%d.%m.%Y'
+    )
+    production = pd.concat([pd.read_csv(f'{input_directory}/production_kmb.csv', **production_read_args),
+                            pd.read_csv(f'{input_directory}/production_tk.csv', **production_read_args)],
+                           ignore_index=True)
+    production = production.merge(well_table, 'inner', left_on='*WELL', right_on='Название в модели')
     production = preprocess_prod(production)
-    production = production[production['Привязка к залежи'] == field]
-    
-    perf = pd.read_csv(f'{input_directory}/perf_kmb_all.csv', encoding='cp1251', sep=';')
-    perf = pd.concat([perf] +
-                    [pd.read_csv(f'{input_directory}/perf_tk_all.csv', encoding='cp1251', sep=';')]
-                    )
-    perf = perf.drop_duplicates()
+    # rows without injection or production produce no controls
+    production = production[production['inj_flag'] | production['prod_flag']]
+
+    perf = pd.concat([pd.read_csv(f'{input_directory}/perf_kmb_all.csv', encoding='cp1251', sep=';'),
+                      pd.read_csv(f'{input_directory}/perf_tk_all.csv', encoding='cp1251', sep=';')],
+                     ignore_index=True)
+    perf = perf.drop_duplicates(subset=['Скважина', 'Дата', 'Тип перфорации',
+                                        'Глубина начала интервала перфорации(md), м',
+                                        'Глубина конца интервала перфорации(md), м'])
     perf = preprocess_perf(perf)
-    perf = perf.merge(pd.read_csv(f'{input_directory}/well_table.csv', encoding='cp1251', sep=','),
-                      'right', left_on='Скважина', right_on='Скважина в МЭР')
-    perf = perf[perf['Привязка к залежи'] == field]
+    perf = perf.merge(well_table, 'right', left_on='Скважина', right_on='Скважина в МЭР')
 
     perf_slice = perf[perf['Скважина'].isna()]
     assert perf_slice.shape[0] <= 1, f'Wells {list(perf_slice["Название в модели"])} have no perforations'
@@ -104,93 +208,50 @@ if __name__ == '__main__':
     man_ops = preprocess_manops(man_ops)
     man_ops = man_ops[man_ops['Месторождение'] == field]
 
-    first_month_flag = True  # prevents printing the first timestep DATES since it's defined in START kwd
+    timesteps = pd.date_range(start_date, end_date, freq='1MS')
+
+    # selected before sorting by date so that the records keep their merge order
+    if len(timesteps):
+        pre_start_perf = perf[perf['Дата'] < timesteps[0]]
+    else:  # an empty date range writes no timesteps and hence no preceding perforations either
+        pre_start_perf = perf.iloc[:0]
+
+    # sorting the data by date once so that every timestep is a contiguous slice
+    production = production.sort_values('DATE', kind='stable')
+    perf = perf.sort_values('Дата', kind='stable')
+    man_ops = man_ops.sort_values('Дата', kind='stable')
+    production_dates = production['DATE'].to_numpy()
+    perf_dates = perf['Дата'].to_numpy()
+    man_ops_dates = man_ops['Дата'].to_numpy()
 
-    with open(f'{output_directory}/HIST.SCH', 'w') as outfile:
-        for timestep in tqdm(pd.date_range(start_date, end_date, freq='1MS'), desc='writing timesteps'):
+    # keywords resetting the controls of the previous timestep, identical for every timestep
+    reset_block = []
+    wconprodh_out('*', 'SHUT', 'LRAT', dest=reset_block)
+    wconinjh_out('*', 'WATER', 'SHUT', dest=reset_block)
+    wefac_out('*', 1, dest=reset_block)
+    reset_block = ''.join(reset_block)
 
-            if first_month_flag:  # perforations preceding the date specified in the START keyword
-                perf_slice = perf[perf['Дата'] < timestep]
-                for _, row in perf_slice.iterrows():
-                    perf_out(
-                        well_name=row['Название в модели'],
-                        lower_depth=row['Глубина начала интервала перфорации(md), м'],
-                        upper_depth=row['Глубина конца интервала перфорации(md), м'],
-                        depth_type='MD',
-                        status='OPEN' if row['perf_flag'] else 'SHUT',
-                        well_diam=.16,
-                        dest=outfile
-                    )
+    buf = []  # keywords of the current timestep, flushed to the file in a single write
 
-            if not first_month_flag:
+    # perforations preceding the date specified in the START keyword
+    perforations_out(pre_start_perf, buf)
 
-                dates_out(timestep.date(), dest=outfile)
+    with open(f'{output_directory}/HIST.SCH', 'w', buffering=1 << 20) as outfile:
+        for step_num, timestep in enumerate(tqdm(timesteps, desc='writing timesteps')):
+
+            # the first timestep DATES is not written since it's defined in START kwd
+            if step_num > 0:
+                dates_out(timestep.date(), dest=buf)
 
                 # resetting controls from previous timestep
-                wconprodh_out('*', 'SHUT', 'LRAT', dest=outfile)
-                wconinjh_out('*', 'WATER', 'SHUT', dest=outfile)
-                wefac_out('*', 1, dest=outfile)
-
-            first_month_flag = False
-
-            production_slice = production[production['DATE'] == timestep]
-            perf_slice = perf[perf['Дата'] == timestep]
-            man_ops_slice = man_ops[man_ops['Дата'] == timestep]
-
-            for _, row in perf_slice.iterrows():
-                perf_out(
-                    well_name=row['Название в модели'],
-                    lower_depth=row['Глубина начала интервала перфорации(md), м'],
-                    upper_depth=row['Глубина конца интервала перфорации(md), м'],
-                    depth_type='MD',
-                    status='OPEN' if row['perf_flag'] else 'SHUT',
-                    well_diam=.16,
-                    dest=outfile
-                )
-
-            # main controls
-            for _, row in production_slice.iterrows():
-                write_weff = False
-
-                if row['WINJ'] > 0:
-                    write_weff = True
-                    wconinjh_out(
-                        well_name=row['*WELL'],
-                        injected_fluid='WATER',
-                        well_status='OPEN',
-                        inj_rate_h=row['WINJ'],
-                        bhp_h=row['BHP'] if row['BHP'] > 0 else '*',
-                        thp_h=row['THP'] if row['THP'] > 0 else '*',
-                        well_control='RATE',
-                        dest=outfile
-                    )
-
-                if row['OIL'] > 0:
-                    write_weff = True
-                    wconprodh_out(
-                        well_name=row['*WELL'],
-                        well_status='OPEN',
-                        well_control='LRAT',
-                        oil_rate_h=row['OIL'],
-                        water_rate_h=row['WATER'],
-                        gas_rate_h=row['GAS'],
-                        thp_h=row['THP'] if row['THP'] > 0 else '*',
-                        bhp_h=row['BHP'] if row['BHP'] > 0 else '*',
-                        dest=outfile
-                    )
-
-                if write_weff:
-                    wefac_out(
-                        well_name=row['*WELL'],
-                        efficiency_factor=row['DAYS'] / row['month_length'],
-                        dest=outfile
-                    )
-
-            # manual operations
-            for _, row in man_ops_slice.iterrows():
-
-                generic_kw_out(
-                    keyword=row['Ключевое слово'],
-                    args=row['Аргумент'],
-                    dest=outfile
-                )
+                buf.append(reset_block)
+
+            timestep_out(
+                production_slice=timestep_slice(production, production_dates, timestep),
+                perf_slice=timestep_slice(perf, perf_dates, timestep),
+                man_ops_slice=timestep_slice(man_ops, man_ops_dates, timestep),
+                dest=buf
+            )
+
+            outfile.write(''.join(buf))
+            buf.clear()
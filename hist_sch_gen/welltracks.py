@@ -16,29 +16,27 @@ if __name__ == '__main__':
     output_directory = sys.argv[2]
     field = sys.argv[3]
 
-    df = pd.read_csv(f'{input_directory}/traj_kmb_all.csv', sep=';')
-    df = pd.concat([df] + [pd.read_csv(f'{input_directory}/traj_tk_all.csv', sep='\t')])
+    df = pd.concat([pd.read_csv(f'{input_directory}/traj_kmb_all.csv', sep=';'),
+                    pd.read_csv(f'{input_directory}/traj_tk_all.csv', sep='\t')],
+                   ignore_index=True)
 
     # removes duplicates in case a well appears both in KMB and TK RN-KIN projects
-    df['id_md'] = df['Скважина'].str.cat(df['MD'].astype('str'))
-    df = df.drop_duplicates('id_md')
+    df = df.drop_duplicates(subset=['Скважина', 'MD'])
 
-    df = df.merge(
-        pd.read_csv(f'{input_directory}/well_table.csv', encoding='cp1251'),
-        'right', left_on='Скважина', right_on='Скважина в МЭР'
-    )
+    well_table = pd.read_csv(f'{input_directory}/well_table.csv', encoding='cp1251')
+    well_table = well_table[well_table['Привязка к залежи'] == field]
 
-    df = df[df['Привязка к залежи'] == field]
+    df = df.merge(well_table, 'right', left_on='Скважина', right_on='Скважина в МЭР')
 
-    with open(f'{output_directory}/WELLTRACK.INC', 'w') as outfile:
-        for well in tqdm(df['Название в модели'].unique(), desc='writing WELLTRACKS'):
-            df_slice = df[df['Название в модели'] == well]
+    with open(f'{output_directory}/WELLTRACK.INC', 'w', buffering=1 << 20) as outfile:
+        wells = df.groupby('Название в модели', sort=False)
+        for well, df_slice in tqdm(wells, total=wells.ngroups, desc='writing WELLTRACKS'):
 
             assert df_slice['Скважина'].shape[0] > 1, f'Welltrack for well {well} is missing'
 
             specs_out(
                 well_name=well,
-                pad=df_slice.loc[df_slice.first_valid_index(), 'КП в модели'],
+                pad=df_slice['КП в модели'].iloc[0],
                 dest=outfile)
 
             traj_out(